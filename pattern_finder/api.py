@@ -1,23 +1,26 @@
 
 
 import os
-from fastapi import FastAPI
+import re
+import json
+import asyncio
+import threading
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import (
     DATA_PATH,
     PROCESSED_DATA_PATH,
+    DATASETS,
     CORRELATION_THRESHOLD,
+    HANDLER_POOL_BUDGET_BYTES,
+    WATCH_POLL_INTERVAL_SEC,
+    WATCH_DEBOUNCE_SEC,
     OUTPUT_DIR
 )
-
-from data_handler import RawFileDataHandler
-from cleaned_csv_handler import CleanedCSVFolderHandler
-from loss_vector_builder import LossVectorBuilder
-from correlation_engine import CorrelationEngine
-from clustering_engine import ClusteringEngine
-from confidence import compute_confidence
-from exporter import export_topology
+from handler_pool import HandlerPool
 
 app = FastAPI(title="Nokia Fronthaul Intelligence API")
 
@@ -28,42 +31,317 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-LAST_RESULT = None
+# dataset id -> {"mode": "raw" | "processed", "path": folder}
+REGISTRY = {dataset_id: dict(spec) for dataset_id, spec in DATASETS.items()}
 
+# dataset id -> last exported topology
+RESULTS = {}
 
-def run_engine(dataset_mode="raw"):
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+# dataset id -> lock serializing reads/writes of its pool state and result
+LOCKS = {}
+_LOCKS_GUARD = threading.Lock()
 
-    if dataset_mode == "processed":
-        handler = CleanedCSVFolderHandler(PROCESSED_DATA_PATH)
-    else:
-        handler = RawFileDataHandler(DATA_PATH)
+# Dataset ids become folder names under OUTPUT_DIR
+DATASET_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
 
-    cells = handler.get_cells()
-    cell_count = len(cells)
 
-    if cell_count < 2:
-        return {
-            "error": "Not enough cells for topology inference",
-            "cell_count": cell_count
-        }
+def _load_handler(dataset_id):
+    from handlers import load_handler
+
+    spec = REGISTRY[dataset_id]
+    return load_handler(spec["mode"], spec["path"])
+
+
+POOL = HandlerPool(HANDLER_POOL_BUDGET_BYTES, _load_handler)
+
+
+def _dataset_lock(dataset_id):
+    with _LOCKS_GUARD:
+        return LOCKS.setdefault(dataset_id, threading.RLock())
+
+
+def _require_dataset(dataset_id):
+    if dataset_id not in REGISTRY:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown dataset '{dataset_id}'"
+        )
+
+
+def _dataset_output_dir(dataset_id):
+    """
+    OUTPUT_DIR/<dataset_id>, refusing anything that resolves outside
+    OUTPUT_DIR (e.g. ids containing path separators or "..")
+    """
+    root = os.path.realpath(OUTPUT_DIR)
+    output_dir = os.path.realpath(os.path.join(root, dataset_id))
+
+    if os.path.commonpath([root, output_dir]) != root or output_dir == root:
+        raise ValueError(f"Dataset id '{dataset_id}' escapes the output directory")
+
+    return output_dir
 
-    vectors = LossVectorBuilder(handler).build()
-    corr_df = CorrelationEngine(CORRELATION_THRESHOLD).compute_matrix(vectors)
-    link_map = ClusteringEngine(CORRELATION_THRESHOLD).cluster(corr_df)
+
+def _capacity(link_map, state):
+    from capacity_estimator import LinkCapacityEstimator
+
+    # A link's capacity depends only on its cells, so it is estimated
+    # once per cell set and reused across threshold cuts
+    missing = {
+        link: cells for link, cells in link_map.items()
+        if frozenset(cells) not in state.capacity
+    }
+    if missing:
+        estimated = LinkCapacityEstimator().estimate(missing, state.handler)
+        for link, cells in missing.items():
+            state.capacity[frozenset(cells)] = estimated[link]
+
+    return {link: state.capacity[frozenset(cells)] for link, cells in link_map.items()}
+
+
+def _export_state(dataset_id, state, threshold=CORRELATION_THRESHOLD):
+    from confidence import compute_confidence
+    from exporter import export_topology
+
+    # Same single-linkage grouping as ClusteringEngine, from the cache
+    corr_df = state.corr_df
+    link_map = state.dendrogram.cut(threshold)
 
     confidences = compute_confidence(link_map, corr_df)
+    capacity_map = _capacity(link_map, state)
 
-    export_path = os.path.join(OUTPUT_DIR, "topology.json")
+    output_dir = _dataset_output_dir(dataset_id)
+    os.makedirs(output_dir, exist_ok=True)
+    export_path = os.path.join(output_dir, "topology.json")
 
     return export_topology(
         export_path,
         link_map,
         confidences,
-        CORRELATION_THRESHOLD,
-        dataset_mode,
-        cell_count
+        threshold,
+        dataset_id,
+        len(corr_df.index),
+        capacity_map
+    )
+
+
+def _set_matrix(state, corr_df):
+    from dendrogram import ThresholdDendrogram
+
+    state.corr_df = corr_df
+    state.dendrogram = ThresholdDendrogram.from_matrix(corr_df)
+
+
+def _sync_state(dataset_id, state, changed_files=()):
+    """
+    Brings a built state in line with the files on disk. Cells whose
+    capture was rewritten, renamed or added get new vectors and
+    correlation rows, removed cells are dropped, all others are kept.
+    """
+    from artifact_store import source_entries
+    from loss_vector_builder import LossVectorBuilder
+    from correlation_engine import CorrelationEngine
+
+    # Rescan so added/removed files are picked up
+    handler = _load_handler(dataset_id)
+    sources = source_entries(handler)
+    if sources == state.sources and not changed_files:
+        return
+
+    if hasattr(handler, "inherit_cache"):
+        handler.inherit_cache(state.handler)
+    cells = handler.get_cells()
+
+    changed = {c for c in cells if sources[c] != state.sources.get(c)}
+    changed |= {handler.cell_id_from_filename(f) for f in changed_files}
+    changed &= set(cells)
+
+    state.handler = handler
+    state.sources = sources
+    state.capacity = {
+        key: value for key, value in state.capacity.items()
+        if key <= set(cells) and not key & changed
+    }
+
+    if state.vectors is None or state.corr_df is None or len(cells) < 2:
+        # Nothing to update incrementally; rebuilt on the next warm-up
+        state.vectors = None
+        state.corr_df = None
+        state.dendrogram = None
+        return
+
+    stale = [c for c in cells if c in changed]
+    if hasattr(handler, "preload"):
+        handler.preload(stale)
+    fresh = LossVectorBuilder(handler).build(stale)
+    vectors = {
+        c: fresh[c] if c in fresh else state.vectors[c]
+        for c in cells
+    }
+
+    _set_matrix(
+        state,
+        CorrelationEngine(CORRELATION_THRESHOLD).update_matrix(
+            state.corr_df, vectors, changed
+        )
     )
+    state.vectors = vectors
+
+
+def _warm_state(dataset_id, changed_files=()):
+    """
+    Returns the dataset's pool state with vectors, matrix and
+    dendrogram filled in and matching the files on disk,
+    or None if it has too few cells
+    """
+    # Pipeline modules pull in numpy/pandas; import on first run
+    # so the service starts without them
+    from artifact_store import source_entries
+    from loss_vector_builder import LossVectorBuilder
+    from correlation_engine import CorrelationEngine
+
+    state = POOL.get(dataset_id)
+
+    # Warm datasets reuse their vectors and matrix, unless
+    # captures changed since they were built
+    if state.sources is not None:
+        _sync_state(dataset_id, state, changed_files)
+
+    if len(state.handler.get_cells()) < 2:
+        return None
+
+    if state.vectors is None:
+        # Recorded before reading, so writes during the read
+        # are picked up by the next request
+        state.sources = source_entries(state.handler)
+        if hasattr(state.handler, "preload"):
+            state.handler.preload()
+        state.vectors = LossVectorBuilder(state.handler).build()
+    if state.corr_df is None:
+        _set_matrix(
+            state,
+            CorrelationEngine(CORRELATION_THRESHOLD).compute_matrix(state.vectors)
+        )
+    POOL.commit(dataset_id)
+
+    return state
+
+
+def _too_few_cells(dataset_id):
+    return {
+        "error": "Not enough cells for topology inference",
+        "cell_count": len(POOL.get(dataset_id).handler.get_cells())
+    }
+
+
+def run_engine(dataset_id="raw", threshold=CORRELATION_THRESHOLD):
+    state = _warm_state(dataset_id)
+    if state is None:
+        return _too_few_cells(dataset_id)
+
+    return _export_state(dataset_id, state, threshold)
+
+
+def cut_topology(dataset_id, threshold):
+    """
+    Topology at any threshold from the cached dendrogram:
+    no correlation or clustering rerun, nothing written to disk
+    """
+    from confidence import compute_confidence
+    from exporter import build_topology
+
+    state = _warm_state(dataset_id)
+    if state is None:
+        return _too_few_cells(dataset_id)
+
+    link_map = state.dendrogram.cut(threshold)
+    return build_topology(
+        link_map,
+        compute_confidence(link_map, state.corr_df),
+        threshold,
+        dataset_id,
+        len(state.dendrogram.cells),
+        _capacity(link_map, state)
+    )
+
+
+def refresh_engine(dataset_id, changed_files):
+    """
+    Incremental rerun after capture files changed: only cells whose
+    files changed are re-read and get new correlation rows, every
+    other cell keeps its cached vector
+    """
+    # Keep the threshold the dataset was last run with
+    threshold = (RESULTS.get(dataset_id) or {}).get("threshold", CORRELATION_THRESHOLD)
+
+    state = _warm_state(dataset_id, changed_files)
+    if state is None:
+        return _too_few_cells(dataset_id)
+
+    return _export_state(dataset_id, state, threshold)
+
+
+# ===============================
+# WATCH MODE
+# ===============================
+# dataset id -> set of asyncio.Queue, one per connected client
+SUBSCRIBERS = {}
+WATCH_TASKS = {}
+
+
+def _publish(dataset_id, event, payload):
+    for queue in SUBSCRIBERS.get(dataset_id, ()):
+        queue.put_nowait((event, payload))
+
+
+def _refresh_and_diff(dataset_id, changed):
+    from watcher import diff_topology
+
+    with _dataset_lock(dataset_id):
+        result = refresh_engine(dataset_id, changed)
+        if "error" in result:
+            return result, {}
+
+        diff = diff_topology(RESULTS.get(dataset_id), result)
+        RESULTS[dataset_id] = result
+        return result, diff
+
+
+async def _watch_dataset(dataset_id):
+    from watcher import FolderWatcher, is_empty_diff
+
+    watcher = FolderWatcher(REGISTRY[dataset_id]["path"], WATCH_DEBOUNCE_SEC)
+
+    while SUBSCRIBERS.get(dataset_id):
+        await asyncio.sleep(WATCH_POLL_INTERVAL_SEC)
+
+        changed = await asyncio.to_thread(watcher.poll)
+        if not changed:
+            continue
+
+        try:
+            result, diff = await asyncio.to_thread(_refresh_and_diff, dataset_id, changed)
+        except Exception as e:
+            _publish(dataset_id, "error", {"dataset": dataset_id, "error": str(e)})
+            continue
+
+        if "error" in result:
+            _publish(dataset_id, "error", {"dataset": dataset_id, **result})
+            continue
+
+        if not is_empty_diff(diff):
+            _publish(dataset_id, "topology_diff", {
+                "dataset": dataset_id,
+                "generated_at": result["generated_at"],
+                "changed_files": sorted(changed),
+                **diff
+            })
+
+    WATCH_TASKS.pop(dataset_id, None)
+
+
+def _sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
 
 
 @app.get("/")
@@ -71,17 +349,78 @@ def root():
     return {"service": "Nokia Fronthaul Intelligence API", "status": "running"}
 
 
+@app.get("/datasets")
+def datasets():
+    return {
+        "datasets": REGISTRY,
+        "pool": POOL.stats()
+    }
+
+
+@app.post("/datasets")
+def register_dataset(dataset_id: str, path: str, mode: str = "raw"):
+    if not DATASET_ID_PATTERN.match(dataset_id):
+        raise HTTPException(
+            status_code=400,
+            detail="dataset_id may only contain letters, digits, '_' and '-'"
+        )
+    if mode not in ("raw", "processed"):
+        raise HTTPException(status_code=400, detail="mode must be raw or processed")
+    if not os.path.isdir(path):
+        raise HTTPException(status_code=400, detail=f"No such folder: {path}")
+
+    REGISTRY[dataset_id] = {"mode": mode, "path": path}
+
+    # Re-registering points the id at new data; drop stale state
+    with _dataset_lock(dataset_id):
+        POOL.drop(dataset_id)
+        RESULTS.pop(dataset_id, None)
+
+    return {"dataset": dataset_id, **REGISTRY[dataset_id]}
+
+
 @app.get("/run")
-def run(dataset: str = "raw"):
-    global LAST_RESULT
-    LAST_RESULT = run_engine(dataset)
-    return LAST_RESULT
+def run(dataset: str = "raw", threshold: float = CORRELATION_THRESHOLD):
+    _require_dataset(dataset)
+    with _dataset_lock(dataset):
+        RESULTS[dataset] = run_engine(dataset, threshold)
+        return RESULTS[dataset]
 
 
 @app.get("/topology")
-def topology():
-    global LAST_RESULT
-    return LAST_RESULT or {"error": "Run /run first"}
+def topology(dataset: str = "raw", threshold: Optional[float] = None):
+    """
+    Without threshold: the last /run result.
+    With threshold: cut of the cached dendrogram (same grouping as
+    /run at that threshold, without writing to disk).
+    """
+    _require_dataset(dataset)
+
+    if threshold is not None:
+        with _dataset_lock(dataset):
+            return cut_topology(dataset, threshold)
+
+    return RESULTS.get(dataset) or {"error": f"Run /run?dataset={dataset} first"}
+
+
+@app.get("/stability")
+def stability(dataset: str = "raw"):
+    """
+    Number of links vs threshold from the cached dendrogram
+    """
+    _require_dataset(dataset)
+
+    with _dataset_lock(dataset):
+        state = _warm_state(dataset)
+        if state is None:
+            return _too_few_cells(dataset)
+        dendrogram = state.dendrogram
+
+    return {
+        "dataset": dataset,
+        "cell_count": len(dendrogram.cells),
+        "curve": dendrogram.stability_curve()
+    }
 
 
 @app.get("/metadata")
@@ -89,5 +428,39 @@ def metadata():
     return {
         "threshold": CORRELATION_THRESHOLD,
         "raw_data_path": DATA_PATH,
-        "processed_data_path": PROCESSED_DATA_PATH
+        "processed_data_path": PROCESSED_DATA_PATH,
+        "datasets": REGISTRY,
+        "pool_budget_bytes": HANDLER_POOL_BUDGET_BYTES
     }
+
+
+@app.get("/events")
+async def events(request: Request, dataset: str = "raw"):
+    """
+    Server-Sent Events stream of topology diffs for one dataset.
+    Sends the current topology first, then a `topology_diff` event
+    whenever watched capture files change.
+    """
+    _require_dataset(dataset)
+
+    queue = asyncio.Queue()
+    SUBSCRIBERS.setdefault(dataset, set()).add(queue)
+
+    if dataset not in WATCH_TASKS:
+        WATCH_TASKS[dataset] = asyncio.create_task(_watch_dataset(dataset))
+
+    async def stream():
+        try:
+            yield _sse("snapshot", RESULTS.get(dataset) or {"dataset": dataset})
+
+            while not await request.is_disconnected():
+                try:
+                    event, payload = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(event, payload)
+        finally:
+            SUBSCRIBERS.get(dataset, set()).discard(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
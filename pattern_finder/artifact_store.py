@@ -0,0 +1,214 @@
+# artifact_store.py
+
+import os
+import json
+import hashlib
+from datetime import datetime
+
+import numpy as np
+
+
+def fingerprint(*parts):
+    """
+    Stable hash of JSON-serializable parts
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def source_entries(handler):
+    """
+    cell -> [file name, size, mtime] for a handler's input files
+    """
+    entries = {}
+    for cell, path in handler.file_map.items():
+        st = os.stat(path)
+        entries[cell] = [os.path.basename(path), st.st_size, st.st_mtime_ns]
+    return entries
+
+
+def source_fingerprint(handler):
+    """
+    Fingerprint of a handler's input files (name, size, mtime).
+    Changes whenever a capture file is added, removed or rewritten.
+    """
+    return fingerprint([
+        [cell, *entry] for cell, entry in sorted(source_entries(handler).items())
+    ])
+
+
+class ArtifactStore:
+    """
+    Checkpointed pipeline artifacts, one folder per stage:
+
+    <root>/<stage>/manifest.json
+    <root>/<stage>/<name>.npy
+
+    Arrays are written as .npy so they can be memory-mapped back.
+    The manifest is written last, so a stage only counts as done once
+    all of its files are complete; it records the input fingerprint,
+    the stage parameters and small JSON data (cell index, link map).
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, root):
+        self.root = root
+
+    def _stage_dir(self, stage):
+        return os.path.join(self.root, stage)
+
+    def _write_atomic(self, path, write):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+
+    def load(self, stage, stage_fingerprint):
+        """
+        Returns the stage manifest if it exists, matches the
+        fingerprint and all its files are intact, else None
+        """
+        path = os.path.join(self._stage_dir(stage), self.MANIFEST)
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if manifest.get("fingerprint") != stage_fingerprint:
+            return None
+
+        for name, size in manifest.get("files", {}).items():
+            file_path = os.path.join(self._stage_dir(stage), name)
+            if not os.path.isfile(file_path) or os.path.getsize(file_path) != size:
+                return None
+
+        return manifest
+
+    def array_path(self, stage, name):
+        return os.path.join(self._stage_dir(stage), f"{name}.npy")
+
+    def array(self, stage, name, mmap=True):
+        return np.load(self.array_path(stage, name), mmap_mode="r" if mmap else None)
+
+    def begin(self, stage):
+        """
+        Invalidates a stage before its files are (re)written, so a
+        crash mid-write never leaves a manifest pointing at
+        half-written files. Call before writing to array_path()
+        directly; save() calls it itself.
+        """
+        stage_dir = self._stage_dir(stage)
+        os.makedirs(stage_dir, exist_ok=True)
+
+        manifest_path = os.path.join(stage_dir, self.MANIFEST)
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+        return manifest_path
+
+    def save(self, stage, stage_fingerprint, params=None, arrays=None, data=None,
+             written=()):
+        """
+        arrays: name -> array, written to <name>.npy
+        written: names of .npy files already written in place
+                 (at array_path()) since begin()
+        """
+        manifest_path = self.begin(stage)
+
+        files = {}
+        for name, arr in (arrays or {}).items():
+            path = self.array_path(stage, name)
+            self._write_atomic(path, lambda f, a=arr: np.save(f, np.asarray(a)))
+            files[os.path.basename(path)] = os.path.getsize(path)
+
+        for name in written:
+            path = self.array_path(stage, name)
+            files[os.path.basename(path)] = os.path.getsize(path)
+
+        manifest = {
+            "stage": stage,
+            "fingerprint": stage_fingerprint,
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "params": params or {},
+            "files": files,
+            "data": data or {}
+        }
+        self._write_atomic(
+            manifest_path,
+            lambda f: f.write(json.dumps(manifest, indent=2).encode())
+        )
+
+        return manifest
+
+    # ---------------------------
+    # Stage helpers
+    # ---------------------------
+    def save_vectors(self, stage_fingerprint, vectors, params=None):
+        """
+        Stacks loss vectors into one (cells x slots) matrix,
+        aligned to the shortest series
+        """
+        cells = list(vectors.keys())
+        length = min(len(vectors[c]) for c in cells)
+        stacked = np.vstack([np.asarray(vectors[c][:length]) for c in cells])
+
+        return self.save(
+            "vectors", stage_fingerprint, params,
+            arrays={"vectors": stacked},
+            data={"cells": cells}
+        )
+
+    def load_vectors(self, manifest):
+        stacked = self.array("vectors", "vectors")
+        return {cell: stacked[i] for i, cell in enumerate(manifest["data"]["cells"])}
+
+    def matrix_path(self):
+        """
+        Where an engine can write the matrix directly
+        (then save_matrix(..., in_place=True))
+        """
+        return self.array_path("correlation", "corr_matrix")
+
+    def save_matrix(self, stage_fingerprint, corr_df, params=None, in_place=False):
+        """
+        in_place: the matrix was already written to matrix_path()
+                  after begin("correlation"), so only the manifest is saved
+        """
+        if in_place:
+            return self.save(
+                "correlation", stage_fingerprint, params,
+                data={"cells": list(corr_df.index)},
+                written=["corr_matrix"]
+            )
+
+        return self.save(
+            "correlation", stage_fingerprint, params,
+            arrays={"corr_matrix": corr_df.to_numpy()},
+            data={"cells": list(corr_df.index)}
+        )
+
+    def load_matrix(self, manifest):
+        import pandas as pd
+
+        cells = manifest["data"]["cells"]
+        mat = self.array("correlation", "corr_matrix")
+        return pd.DataFrame(mat, index=cells, columns=cells, copy=False)
+
+    def save_traffic(self, stage_fingerprint, traffic_map, params=None):
+        """
+        One .npy per link (Gbps per slot); link ids go in the manifest
+        """
+        links = list(traffic_map.keys())
+        return self.save(
+            "traffic", stage_fingerprint, params,
+            arrays={f"traffic_{i}": traffic_map[link] for i, link in enumerate(links)},
+            data={"links": links}
+        )
+
+    def load_traffic(self, manifest):
+        return {
+            link: self.array("traffic", f"traffic_{i}", mmap=False).tolist()
+            for i, link in enumerate(manifest["data"]["links"])
+        }
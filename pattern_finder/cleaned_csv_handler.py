@@ -22,13 +22,10 @@ class CleanedCSVFolderHandler(DataHandler):
         self.file_map = {}
 
         for fname in os.listdir(folder_path):
-            if not fname.lower().endswith(".csv"):
+            cell_id = self.cell_id_from_filename(fname)
+            if cell_id is None:
                 continue
 
-            # Extract last number in filename as cell_id
-            base = fname.replace(".csv", "")
-            cell_id = base.split("_")[-1]
-
             self.file_map[cell_id] = os.path.join(folder_path, fname)
 
         if not self.file_map:
@@ -36,6 +33,14 @@ class CleanedCSVFolderHandler(DataHandler):
 
         self.cells = sorted(self.file_map.keys(), key=lambda x: int(x))
 
+    def cell_id_from_filename(self, fname):
+        if not fname.lower().endswith(".csv"):
+            return None
+
+        # Extract last number in filename as cell_id
+        base = fname.replace(".csv", "")
+        return base.split("_")[-1]
+
     def get_cells(self):
         return self.cells
 
@@ -1,25 +1,162 @@
+import numpy as np
 
 
 def compute_confidence(link_map, corr_df):
     """
     Computes average correlation inside each link
     """
+    mat = corr_df.to_numpy()
+    index = {cell: i for i, cell in enumerate(corr_df.index)}
 
     confidences = {}
 
     for link, cells in link_map.items():
-        if len(cells) < 2:
+        members = [index[c] for c in cells if c in index]
+        if len(members) < 2:
             confidences[link] = 0.0
             continue
 
-        scores = []
-        for i in range(len(cells)):
-            for j in range(i + 1, len(cells)):
-                try:
-                    scores.append(float(corr_df.loc[cells[i], cells[j]]))
-                except:
-                    pass
+        # Upper triangle of the link's block = its distinct cell pairs
+        block = mat[np.ix_(members, members)]
+        scores = block[np.triu_indices(len(members), 1)]
 
-        confidences[link] = round(sum(scores) / len(scores), 3) if scores else 0.0
+        confidences[link] = round(float(scores.mean(dtype=np.float64)), 3)
 
     return confidences
+
+
+def _link_pairs(link_map, cells):
+    """
+    Intra-link cell pairs grouped link by link.
+    Returns (links, starts, pair_i, pair_j) where pairs of links[k]
+    occupy pair_i[starts[k]:starts[k + 1]]
+    """
+    index = {cell: i for i, cell in enumerate(cells)}
+    links, starts, pair_i, pair_j = [], [], [], []
+
+    for link, group in link_map.items():
+        members = [index[c] for c in group if c in index]
+        if len(members) < 2:
+            continue
+
+        links.append(link)
+        starts.append(len(pair_i))
+        for a in range(len(members)):
+            for b in range(a + 1, len(members)):
+                pair_i.append(members[a])
+                pair_j.append(members[b])
+
+    return links, starts, pair_i, pair_j
+
+
+def compute_significance(link_map, vectors, n_resamples=200, block_size=None,
+                         alpha=0.05, seed=None, batch_elements=2 ** 22):
+    """
+    Significance of each link's confidence (mean intra-link correlation)
+
+    - p_value: circular-shift permutation test. Every cell's series is
+      rotated by an independent random offset, which keeps its own
+      burst structure but breaks alignment with the other cells.
+    - ci_low / ci_high: non-overlapping block bootstrap percentile
+      interval. The series is cut into fixed blocks of block_size
+      slots (any tail is dropped) and whole blocks are resampled
+      with replacement.
+
+    All resamples are evaluated together: shifted correlations are read
+    from FFT cross-correlations, and bootstrap correlations are built
+    from per-block sums, so no resample touches the raw series again.
+    """
+    cells = [c for c in vectors if len(vectors[c]) > 0]
+    links, starts, pair_i, pair_j = _link_pairs(link_map, cells)
+
+    empty = {
+        "p_value": None,
+        "ci_low": None,
+        "ci_high": None,
+        "resamples": n_resamples,
+        "block_size": None
+    }
+    significance = {link: dict(empty) for link in link_map}
+
+    if not links:
+        return significance
+
+    length = min(len(vectors[c]) for c in cells)
+    if block_size is None:
+        block_size = max(1, int(round(length ** (1 / 3))))
+    n_blocks = length // block_size
+    if length <= 5 or n_blocks < 2:
+        return significance
+
+    # Standardize once (zero rows for constant series)
+    z = np.vstack([np.asarray(vectors[c][:length], dtype=float) for c in cells])
+    std = z.std(axis=1, keepdims=True)
+    z = np.where(std > 0, (z - z.mean(axis=1, keepdims=True)) / np.where(std > 0, std, 1), 0.0)
+
+    pair_i = np.asarray(pair_i)
+    pair_j = np.asarray(pair_j)
+    n_pairs = len(pair_i)
+
+    rng = np.random.default_rng(seed)
+    shifts = rng.integers(0, length, size=(n_resamples, len(cells)))
+    counts = rng.multinomial(
+        n_blocks, np.full(n_blocks, 1 / n_blocks), size=n_resamples
+    ).astype(float)
+
+    # Per-block sufficient statistics for each cell (fixed,
+    # non-overlapping blocks; a resample is a count per block)
+    used = n_blocks * block_size
+    blocks = z[:, :used].reshape(len(cells), n_blocks, block_size)
+    s1 = counts @ blocks.sum(axis=2).T
+    s2 = counts @ (blocks ** 2).sum(axis=2).T
+    mean = s1 / used
+    var = np.clip(s2 / used - mean ** 2, 0, None)
+
+    spectrum = np.fft.rfft(z, axis=1)
+
+    observed = np.empty(n_pairs)
+    null = np.empty((n_resamples, n_pairs))
+    boot = np.empty((n_resamples, n_pairs))
+
+    step = max(1, batch_elements // length)
+    for p0 in range(0, n_pairs, step):
+        pi = pair_i[p0:p0 + step]
+        pj = pair_j[p0:p0 + step]
+
+        # xcorr[p, lag] = mean_t z_i[t] * z_j[t + lag]
+        xcorr = np.fft.irfft(
+            np.conj(spectrum[pi]) * spectrum[pj], n=length, axis=1
+        ) / length
+        observed[p0:p0 + step] = xcorr[:, 0]
+
+        lags = (shifts[:, pj] - shifts[:, pi]) % length
+        null[:, p0:p0 + step] = xcorr[np.arange(len(pi)), lags]
+
+        sxy = counts @ (blocks[pi] * blocks[pj]).sum(axis=2).T
+        cov = sxy / used - mean[:, pi] * mean[:, pj]
+        denom = np.sqrt(var[:, pi] * var[:, pj])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            boot[:, p0:p0 + step] = np.where(denom > 0, cov / denom, 0.0)
+
+    # Pair values -> per-link means (pairs are contiguous per link)
+    starts = np.asarray(starts)
+    sizes = np.diff(np.append(starts, n_pairs))
+    link_observed = np.add.reduceat(observed, starts) / sizes
+    link_null = np.add.reduceat(null, starts, axis=1) / sizes
+    link_boot = np.add.reduceat(boot, starts, axis=1) / sizes
+
+    exceed = (link_null >= link_observed - 1e-12).sum(axis=0)
+    p_values = (1 + exceed) / (1 + n_resamples)
+    ci_low = np.percentile(link_boot, 100 * alpha / 2, axis=0)
+    ci_high = np.percentile(link_boot, 100 * (1 - alpha / 2), axis=0)
+
+    for k, link in enumerate(links):
+        significance[link] = {
+            "p_value": round(float(p_values[k]), 4),
+            "ci_low": round(float(ci_low[k]), 3),
+            "ci_high": round(float(ci_high[k]), 3),
+            "resamples": n_resamples,
+            "block_size": block_size
+        }
+
+    return significance
@@ -6,11 +6,25 @@ DATA_PATH = "../data/raw"
 # Processed CSV dataset path (folder)
 PROCESSED_DATA_PATH = "../data/processed"
 
+# Datasets served by the API: id -> input mode + folder
+DATASETS = {
+    "raw": {"mode": "raw", "path": DATA_PATH},
+    "processed": {"mode": "processed", "path": PROCESSED_DATA_PATH},
+}
+
+# Memory budget for warm datasets kept by the API (bytes)
+HANDLER_POOL_BUDGET_BYTES = 2 * 1024 ** 3
+
+# Watch mode: capture folder poll interval and quiet period before recompute
+WATCH_POLL_INTERVAL_SEC = 1.0
+WATCH_DEBOUNCE_SEC = 2.0
+
 # Correlation threshold for linking cells
 CORRELATION_THRESHOLD = 0.3
 
-# Rolling window (reserved for future smoothing)
-ROLLING_WINDOW = 10
+# Sliding-window correlation (in slots) for time-varying topology
+ROLLING_WINDOW = 2000
+ROLLING_STRIDE = 500
 
 # Output directory
 OUTPUT_DIR = "outputs"
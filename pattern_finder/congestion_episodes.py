@@ -0,0 +1,102 @@
+import numpy as np
+
+
+class CongestionEpisodeIndex:
+    """
+    Run-length encoded congestion episodes for one link.
+
+    An episode is a run of consecutive slots where RU delivery falls
+    short of DU demand by more than a threshold. Episodes are stored
+    as parallel typed arrays sorted by start slot, so time-range
+    queries are binary searches and top-K queries read a precomputed
+    ranking instead of rescanning the series.
+    """
+
+    RANK_KEYS = ("bytes_lost", "peak_deficit_gbps", "duration_slots")
+
+    def __init__(self, start, duration, peak_deficit_gbps, bytes_lost):
+        self.start = np.asarray(start, dtype=np.int64)
+        self.duration = np.asarray(duration, dtype=np.int32)
+        self.peak_deficit_gbps = np.asarray(peak_deficit_gbps, dtype=np.float32)
+        self.bytes_lost = np.asarray(bytes_lost, dtype=np.float64)
+
+        # Episodes never overlap, so end slots are sorted as well
+        self._end = self.start + self.duration
+        self._rank = {}
+
+    @classmethod
+    def from_series(cls, demand, delivered, threshold, bytes_per_unit, gbps_per_unit):
+        """
+        demand / delivered: per-slot DU and RU series (same units)
+        threshold: relative shortfall, e.g. 0.05 = RU below 95% of DU
+        bytes_per_unit / gbps_per_unit: unit conversions for the deficit
+        """
+        deficit = np.clip(demand - delivered, 0, None)
+        short = deficit > threshold * demand
+
+        # Run boundaries: +1 where a run starts, -1 one past where it ends
+        edges = np.diff(np.concatenate(([0], short.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        if starts.size == 0:
+            return cls([], [], [], [])
+
+        # reduceat over [start, end) pairs; the padding slot keeps
+        # an episode ending on the last slot in range
+        bounds = np.column_stack((starts, ends)).ravel()
+        padded = np.append(deficit, 0)
+        peaks = np.maximum.reduceat(padded, bounds)[::2]
+        totals = np.add.reduceat(padded, bounds)[::2]
+
+        return cls(
+            starts,
+            ends - starts,
+            peaks * gbps_per_unit,
+            totals * bytes_per_unit
+        )
+
+    def __len__(self):
+        return len(self.start)
+
+    def total_slots(self):
+        return int(self.duration.sum())
+
+    def _records(self, idx):
+        return [
+            {
+                "start_slot": int(self.start[i]),
+                "duration_slots": int(self.duration[i]),
+                "peak_deficit_gbps": round(float(self.peak_deficit_gbps[i]), 3),
+                "bytes_lost": float(self.bytes_lost[i])
+            }
+            for i in idx
+        ]
+
+    def top_k(self, k, by="bytes_lost"):
+        """
+        K worst episodes ranked by bytes_lost, peak_deficit_gbps
+        or duration_slots
+        """
+        if by not in self.RANK_KEYS:
+            raise ValueError(f"by must be one of {', '.join(self.RANK_KEYS)}")
+
+        if by not in self._rank:
+            values = getattr(self, "duration" if by == "duration_slots" else by)
+            self._rank[by] = np.argsort(-values.astype(np.float64), kind="stable")
+
+        return self._records(self._rank[by][:k])
+
+    def in_range(self, start_slot, end_slot):
+        """
+        Episodes overlapping slots [start_slot, end_slot)
+        """
+        first = np.searchsorted(self._end, start_slot, side="right")
+        last = np.searchsorted(self.start, end_slot, side="left")
+        return self._records(range(first, max(first, last)))
+
+    def nbytes(self):
+        return (
+            self.start.nbytes + self.duration.nbytes
+            + self.peak_deficit_gbps.nbytes + self.bytes_lost.nbytes
+        )
@@ -12,6 +12,12 @@ class CorrelationEngine:
     def __init__(self, threshold):
         self.threshold = threshold
 
+    def _pair(self, x, y):
+        if len(x) > 5 and len(y) > 5:
+            corr = np.corrcoef(x, y)[0, 1]
+            return 0 if np.isnan(corr) else corr
+        return 0
+
     def compute_matrix(self, vectors):
         cells = list(vectors.keys())
         n = len(cells)
@@ -26,10 +32,32 @@ class CorrelationEngine:
                 if i == j:
                     mat[i, j] = 1.0
                 else:
-                    if len(x) > 5 and len(y) > 5:
-                        corr = np.corrcoef(x, y)[0, 1]
-                        mat[i, j] = 0 if np.isnan(corr) else corr
-                    else:
-                        mat[i, j] = 0
+                    mat[i, j] = self._pair(x, y)
+
+        return pd.DataFrame(mat, index=cells, columns=cells)
+
+    def update_matrix(self, corr_df, vectors, changed_cells):
+        """
+        Recomputes only the rows/columns of changed (or new) cells,
+        reusing every other entry of a previous matrix.
+        Cells no longer present in vectors are dropped.
+        """
+        cells = list(vectors.keys())
+        n = len(cells)
+
+        mat = corr_df.reindex(index=cells, columns=cells).to_numpy(copy=True)
+
+        stale = [
+            i for i, cell in enumerate(cells)
+            if cell in changed_cells or cell not in corr_df.index
+        ]
+
+        for i in stale:
+            x = vectors[cells[i]]
+            for j in range(n):
+                if i == j:
+                    mat[i, j] = 1.0
+                else:
+                    mat[i, j] = mat[j, i] = self._pair(x, vectors[cells[j]])
 
         return pd.DataFrame(mat, index=cells, columns=cells)
@@ -1,11 +1,83 @@
 import os
+import io
+import re
+import gzip
+import lzma
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 from interfaces import DataHandler
 
+try:
+    import zstandard
+except ImportError:  # optional: only needed for .dat.zst captures
+    zstandard = None
+
+
+CAPTURE_PATTERN = re.compile(r"^pkt-stats-cell-(\d+)\.dat(\.gz|\.zst|\.xz)?$")
+
+
+def _open_capture(path):
+    """
+    Opens a capture as a text stream, decompressing on the fly.
+    Lines are decoded as they are read; no full copy is built.
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt")
+    if path.endswith(".xz"):
+        return lzma.open(path, "rt")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError(
+                f"{os.path.basename(path)} is zstd-compressed; "
+                "install the 'zstandard' package to read it"
+            )
+        raw = open(path, "rb")
+        # Multi-frame captures (pzstd output, concatenated rotations)
+        # would otherwise stop silently after the first frame
+        stream = zstandard.ZstdDecompressor().stream_reader(
+            raw, read_across_frames=True, closefd=True
+        )
+        return io.TextIOWrapper(stream)
+    return open(path, "r")
+
+
+def _read_capture(path):
+    tx_series = []
+    rx_series = []
+    loss_series = []
+
+    with _open_capture(path) as f:
+        for line in f:
+            parts = line.strip().split()
+            if len(parts) < 4:
+                continue
+
+            try:
+                tx = float(parts[1])
+                rx = float(parts[2])
+                late = float(parts[3])
+            except ValueError:
+                continue
+
+            loss = max(0.0, tx - rx + late)
+
+            tx_series.append(tx)
+            rx_series.append(rx)
+            loss_series.append(1.0 if loss > 0 else 0.0)
+
+    return (
+        np.array(tx_series, dtype=float),
+        np.array(rx_series, dtype=float),
+        np.array(loss_series, dtype=float),
+    )
+
 
 class RawFileDataHandler(DataHandler):
     """
     Reads pkt-stats-cell-X.dat files
+    (optionally compressed: .dat.gz, .dat.zst, .dat.xz)
     Supports:
     - Packet loss vectors
     - DU throughput (TX side)
@@ -15,15 +87,28 @@ class RawFileDataHandler(DataHandler):
 
     def __init__(self, data_dir):
         self.data_dir = data_dir
+        self.file_map = {}
+        self._cache = {}
         self.cells = self._scan_cells()
 
     def _scan_cells(self):
-        cells = []
-        for fname in os.listdir(self.data_dir):
-            if fname.startswith("pkt-stats-cell") and fname.endswith(".dat"):
-                cell_id = fname.split("-")[-1].replace(".dat", "")
-                cells.append(cell_id)
-        return sorted(cells, key=lambda x: int(x))
+        for fname in sorted(os.listdir(self.data_dir)):
+            cell_id = self.cell_id_from_filename(fname)
+            if cell_id is None:
+                continue
+
+            # An uncompressed copy wins over compressed ones
+            if cell_id not in self.file_map or fname.endswith(".dat"):
+                self.file_map[cell_id] = os.path.join(self.data_dir, fname)
+
+        return sorted(self.file_map, key=lambda x: int(x))
+
+    def cell_id_from_filename(self, fname):
+        """
+        pkt-stats-cell-X.dat[.gz|.zst|.xz] -> "X", anything else -> None
+        """
+        match = CAPTURE_PATTERN.match(fname)
+        return match.group(1) if match else None
 
     def get_cells(self):
         return self.cells
@@ -31,37 +116,58 @@ class RawFileDataHandler(DataHandler):
     # ---------------------------
     # Internal file reader
     # ---------------------------
+    def _signature(self, path):
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+
     def _read_file(self, cell_id):
-        path = os.path.join(self.data_dir, f"pkt-stats-cell-{cell_id}.dat")
-
-        tx_series = []
-        rx_series = []
-        loss_series = []
-
-        with open(path, "r") as f:
-            for line in f:
-                parts = line.strip().split()
-                if len(parts) < 4:
-                    continue
-
-                try:
-                    tx = float(parts[1])
-                    rx = float(parts[2])
-                    late = float(parts[3])
-                except ValueError:
-                    continue
-
-                loss = max(0.0, tx - rx + late)
-
-                tx_series.append(tx)
-                rx_series.append(rx)
-                loss_series.append(1.0 if loss > 0 else 0.0)
-
-        return (
-            np.array(tx_series, dtype=float),
-            np.array(rx_series, dtype=float),
-            np.array(loss_series, dtype=float),
-        )
+        cell_id = str(cell_id)
+        path = self.file_map[cell_id]
+        signature = self._signature(path)
+
+        cached = self._cache.get(cell_id)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        series = _read_capture(path)
+        self._cache[cell_id] = (signature, series)
+        return series
+
+    def inherit_cache(self, previous):
+        """
+        Reuses parsed series from an earlier handler on the same
+        folder; entries for rewritten files fail the signature check
+        """
+        for cell, entry in getattr(previous, "_cache", {}).items():
+            if cell in self.file_map:
+                self._cache.setdefault(cell, entry)
+
+    def preload(self, cells=None, workers=None):
+        """
+        Decompresses and parses capture files in parallel across
+        processes, caching the results for the get_* methods.
+        Workers are spawned rather than forked, so this is safe to
+        call from threaded servers.
+        """
+        cells = [c for c in (self.cells if cells is None else cells) if c in self.file_map]
+        paths = [self.file_map[c] for c in cells]
+        signatures = [self._signature(p) for p in paths]
+
+        if len(paths) < 2 or workers == 1:
+            results = map(_read_capture, paths)
+        else:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                results = list(pool.map(_read_capture, paths))
+
+        for cell, signature, series in zip(cells, signatures, results):
+            self._cache[cell] = (signature, series)
+
+    def cached_arrays(self):
+        """
+        Parsed series currently held in memory
+        """
+        return [arr for _, series in self._cache.values() for arr in series]
 
     # ---------------------------
     # Interface Methods
@@ -0,0 +1,106 @@
+# dendrogram.py
+
+import numpy as np
+
+
+class ThresholdDendrogram:
+    """
+    Single-linkage merge tree over a correlation matrix.
+
+    Built once (maximum spanning tree, O(n^2)); the topology at any
+    threshold is then the set of connected components over tree edges
+    with correlation >= threshold, found in O(n) without touching the
+    matrix again. ClusteringEngine uses the same cut, so a cached
+    dendrogram and a fresh clustering agree at every threshold.
+    """
+
+    def __init__(self, cells, edge_u, edge_v, edge_w):
+        self.cells = list(cells)
+        # Edges sorted by correlation, strongest first
+        order = np.argsort(-edge_w, kind="stable")
+        self.edge_u = edge_u[order]
+        self.edge_v = edge_v[order]
+        self.edge_w = edge_w[order]
+
+    @classmethod
+    def from_matrix(cls, corr_df):
+        cells = list(corr_df.index)
+        sim = np.nan_to_num(
+            corr_df.to_numpy(dtype=float), nan=-np.inf
+        )
+        n = len(cells)
+
+        edge_u = np.empty(max(n - 1, 0), dtype=np.int64)
+        edge_v = np.empty(max(n - 1, 0), dtype=np.int64)
+        edge_w = np.empty(max(n - 1, 0), dtype=float)
+
+        if n == 0:
+            return cls(cells, edge_u, edge_v, edge_w)
+
+        # Prim's algorithm for the maximum spanning tree
+        in_tree = np.zeros(n, dtype=bool)
+        in_tree[0] = True
+        best = sim[0].copy()
+        parent = np.zeros(n, dtype=np.int64)
+
+        for k in range(n - 1):
+            v = int(np.argmax(np.where(in_tree, -np.inf, best)))
+            edge_u[k], edge_v[k], edge_w[k] = parent[v], v, best[v]
+            in_tree[v] = True
+
+            closer = (sim[v] > best) & ~in_tree
+            best = np.where(closer, sim[v], best)
+            parent = np.where(closer, v, parent)
+
+        return cls(cells, edge_u, edge_v, edge_w)
+
+    def cut(self, threshold):
+        """
+        Returns link_map at threshold, in the same shape as
+        ClusteringEngine.cluster: {"Link_1": [cells...], ...}
+        """
+        n = len(self.cells)
+        merges = int(np.searchsorted(-self.edge_w, -threshold, side="right"))
+
+        root = list(range(n))
+
+        def find(a):
+            while root[a] != a:
+                root[a] = root[root[a]]
+                a = root[a]
+            return a
+
+        for u, v in zip(self.edge_u[:merges].tolist(), self.edge_v[:merges].tolist()):
+            ru, rv = find(u), find(v)
+            if ru != rv:
+                # Keep the earliest cell as root so link order is stable
+                root[max(ru, rv)] = min(ru, rv)
+
+        groups = {}
+        for i in range(n):
+            groups.setdefault(find(i), []).append(self.cells[i])
+
+        return {
+            f"Link_{k}": groups[r]
+            for k, r in enumerate(sorted(groups), start=1)
+        }
+
+    def stability_curve(self):
+        """
+        Number of links vs threshold, one point per merge height:
+        [{"threshold": 0.82, "links": 11}, ...] (strongest first).
+        The link count holds for thresholds down to the next point.
+        """
+        n = len(self.cells)
+        curve = []
+
+        for merges, w in enumerate(self.edge_w.tolist(), start=1):
+            if curve and curve[-1]["threshold"] == round(w, 6):
+                curve[-1]["links"] = n - merges
+            else:
+                curve.append({"threshold": round(w, 6), "links": n - merges})
+
+        return curve
+
+    def nbytes(self):
+        return self.edge_u.nbytes + self.edge_v.nbytes + self.edge_w.nbytes
@@ -1,5 +1,7 @@
 import numpy as np
 
+from congestion_episodes import CongestionEpisodeIndex
+
 class DualCaptureCapacityEstimator:
     """
     Estimates Ethernet link capacity using dual capture points:
@@ -10,15 +12,19 @@ class DualCaptureCapacityEstimator:
     - Peak demand (Gbps)
     - Congestion score
     - Safe capacity with buffer margin
+    - Congestion episode index per link (self.episodes)
     """
 
-    def __init__(self, buffer_margin=0.25, slot_duration_us=143):
+    def __init__(self, buffer_margin=0.25, slot_duration_us=143, episode_threshold=0.05):
         """
         buffer_margin: safety margin for Ethernet provisioning (25% default)
         slot_duration_us: 1 slot = 143 microseconds (from Nokia spec)
+        episode_threshold: relative RU shortfall vs DU that counts as congested
         """
         self.buffer_margin = buffer_margin
         self.slot_duration_us = slot_duration_us
+        self.episode_threshold = episode_threshold
+        self.episodes = {}
 
     def _series_to_gbps(self, packet_series):
         """
@@ -43,6 +49,7 @@ class DualCaptureCapacityEstimator:
         """
 
         capacity_map = {}
+        self.episodes = {}
 
         for link, cells in link_map.items():
             du_series_all = []
@@ -83,12 +90,38 @@ class DualCaptureCapacityEstimator:
 
             safe_capacity = peak_demand * (1 + self.buffer_margin)
 
+            # Per-packet deficit converted to bytes / Gbps like _series_to_gbps
+            episodes = CongestionEpisodeIndex.from_series(
+                du_sum,
+                ru_sum,
+                self.episode_threshold,
+                bytes_per_unit=1500,
+                gbps_per_unit=float(self._series_to_gbps(np.array([1.0]))[0])
+            )
+            self.episodes[link] = episodes
+
             capacity_map[link] = {
                 "peak_demand_gbps": round(peak_demand, 3),
                 "average_demand_gbps": round(avg_demand, 3),
                 "safe_capacity_gbps": round(safe_capacity, 3),
                 "congestion_score": round(congestion, 3),
+                "congestion_episodes": len(episodes),
+                "congested_slots": episodes.total_slots(),
                 "buffer_margin": self.buffer_margin
             }
 
         return capacity_map
+
+    def top_episodes(self, link, k=10, by="bytes_lost"):
+        """
+        Worst congestion episodes of a link from the last estimate()
+        """
+        index = self.episodes.get(link)
+        return index.top_k(k, by) if index is not None else []
+
+    def episodes_between(self, link, start_slot, end_slot):
+        """
+        Congestion episodes of a link overlapping [start_slot, end_slot)
+        """
+        index = self.episodes.get(link)
+        return index.in_range(start_slot, end_slot) if index is not None else []
@@ -2,15 +2,15 @@ import json
 from datetime import datetime
 
 
-def export_topology(
-    output_path,
+def build_topology(
     link_map,
     confidences,
     threshold,
     dataset_mode,
     cell_count,
     capacity_map=None,
-    traffic_map=None
+    traffic_map=None,
+    significance_map=None
 ):
     export_data = {
         "generated_at": datetime.utcnow().isoformat() + "Z",
@@ -28,9 +28,54 @@ def export_topology(
             "capacity": capacity_map.get(link, {}) if capacity_map else {},
             "traffic_timeseries": (
                 traffic_map.get(link, []) if traffic_map else []
+            ),
+            "significance": (
+                significance_map.get(link, {}) if significance_map else {}
             )
         })
 
+    return export_data
+
+
+def export_topology(
+    output_path,
+    link_map,
+    confidences,
+    threshold,
+    dataset_mode,
+    cell_count,
+    capacity_map=None,
+    traffic_map=None,
+    significance_map=None
+):
+    export_data = build_topology(
+        link_map,
+        confidences,
+        threshold,
+        dataset_mode,
+        cell_count,
+        capacity_map,
+        traffic_map,
+        significance_map
+    )
+
+    with open(output_path, "w") as f:
+        json.dump(export_data, f, indent=2)
+
+    return export_data
+
+
+def export_timeline(output_path, timeline, threshold, window, stride):
+    export_data = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "threshold": threshold,
+        "window_slots": window,
+        "stride_slots": stride,
+        "window_count": len(timeline),
+        "change_count": sum(1 for w in timeline if w["changed_cells"]),
+        "windows": timeline
+    }
+
     with open(output_path, "w") as f:
         json.dump(export_data, f, indent=2)
 
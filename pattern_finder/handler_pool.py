@@ -0,0 +1,108 @@
+# handler_pool.py
+
+import threading
+from collections import OrderedDict
+
+
+class DatasetState:
+    """
+    Warm state for one dataset: its handler plus the loss vectors,
+    correlation matrix and threshold dendrogram computed from it.
+    `sources` records the input files (see artifact_store.source_entries)
+    the state was built from, so a stale state can be detected;
+    `capacity` caches link capacity by frozenset of cells.
+    """
+
+    def __init__(self, dataset_id, handler):
+        self.dataset_id = dataset_id
+        self.handler = handler
+        self.sources = None
+        self.vectors = None
+        self.corr_df = None
+        self.dendrogram = None
+        self.capacity = {}
+
+    def nbytes(self):
+        # Loss vectors are usually the handler's cached arrays, so
+        # arrays are counted once by identity
+        arrays = {}
+
+        for series in (self.vectors or {}).values():
+            arrays[id(series)] = series
+
+        cached = getattr(self.handler, "cached_arrays", None)
+        if cached is not None:
+            for series in cached():
+                arrays[id(series)] = series
+
+        total = sum(getattr(a, "nbytes", 0) for a in arrays.values())
+
+        if self.corr_df is not None:
+            total += self.corr_df.values.nbytes
+
+        if self.dendrogram is not None:
+            total += self.dendrogram.nbytes()
+
+        return total
+
+
+class HandlerPool:
+    """
+    Keeps warm DatasetState objects under a global memory budget.
+    Least recently used datasets are evicted first; the most recently
+    used one is always kept, even if it alone exceeds the budget.
+    """
+
+    def __init__(self, budget_bytes, loader):
+        """
+        budget_bytes: total bytes allowed across all warm datasets
+        loader: callable(dataset_id) -> DataHandler
+        """
+        self.budget_bytes = budget_bytes
+        self.loader = loader
+        self._states = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, dataset_id):
+        with self._lock:
+            state = self._states.get(dataset_id)
+
+            if state is None:
+                state = DatasetState(dataset_id, self.loader(dataset_id))
+                self._states[dataset_id] = state
+
+            self._states.move_to_end(dataset_id)
+            return state
+
+    def commit(self, dataset_id):
+        """
+        Call after filling a state's vectors/matrix so its new size
+        is accounted for and older datasets are evicted if needed
+        """
+        with self._lock:
+            if dataset_id in self._states:
+                self._states.move_to_end(dataset_id)
+            self._evict()
+
+    def drop(self, dataset_id):
+        with self._lock:
+            self._states.pop(dataset_id, None)
+
+    def used_bytes(self):
+        with self._lock:
+            return sum(s.nbytes() for s in self._states.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "budget_bytes": self.budget_bytes,
+                "used_bytes": self.used_bytes(),
+                "warm_datasets": {
+                    dataset_id: state.nbytes()
+                    for dataset_id, state in self._states.items()
+                }
+            }
+
+    def _evict(self):
+        while len(self._states) > 1 and self.used_bytes() > self.budget_bytes:
+            self._states.popitem(last=False)
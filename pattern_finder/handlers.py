@@ -0,0 +1,16 @@
+# handlers.py
+
+from config import DATA_PATH, PROCESSED_DATA_PATH
+
+
+def load_handler(dataset, path=None):
+    """
+    Builds the data handler for a dataset mode ("raw" or "processed").
+    Handler modules are imported on demand so callers stay light.
+    """
+    if dataset == "processed":
+        from cleaned_csv_handler import CleanedCSVFolderHandler
+        return CleanedCSVFolderHandler(path or PROCESSED_DATA_PATH)
+
+    from data_handler import RawFileDataHandler
+    return RawFileDataHandler(path or DATA_PATH)
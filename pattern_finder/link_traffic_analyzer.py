@@ -1,6 +1,5 @@
 import os
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 class LinkTrafficAnalyzer:
@@ -57,6 +56,8 @@ class LinkTrafficAnalyzer:
         """
         Generates Nokia Figure-3 style plot
         """
+        import matplotlib.pyplot as plt
+
         if not series:
             return
 
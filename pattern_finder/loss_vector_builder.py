@@ -8,8 +8,14 @@ class LossVectorBuilder:
     def __init__(self, data_handler):
         self.data_handler = data_handler
 
-    def build(self):
+    def build(self, cells=None):
+        """
+        cells: optional subset to (re)build, defaults to all cells
+        """
+        if cells is None:
+            cells = self.data_handler.get_cells()
+
         vectors = {}
-        for cell in self.data_handler.get_cells():
+        for cell in cells:
             vectors[cell] = self.data_handler.get_loss_series(cell)
         return vectors
@@ -1,42 +1,90 @@
 import os
-import numpy as np
+import sys
+import argparse
 
-from config import DATA_PATH, PROCESSED_DATA_PATH, CORRELATION_THRESHOLD, OUTPUT_DIR
+from config import (
+    CORRELATION_THRESHOLD,
+    ROLLING_WINDOW,
+    ROLLING_STRIDE,
+    OUTPUT_DIR
+)
+from handlers import load_handler
 
-from data_handler import RawFileDataHandler
-from cleaned_csv_handler import CleanedCSVFolderHandler
-from loss_vector_builder import LossVectorBuilder
-from correlation_engine import CorrelationEngine
-from clustering_engine import ClusteringEngine
-from confidence import compute_confidence
-from visualization import Visualizer
-from exporter import export_topology
-from capacity_estimator import LinkCapacityEstimator
-from link_traffic_analyzer import LinkTrafficAnalyzer
+# Heavy dependencies (numpy, pandas, matplotlib, seaborn, networkx)
+# are imported inside the stage that needs them, so a topology-only
+# run never pays for plotting imports.
 
 
 # ===============================
-# CONFIG
+# STAGES
 # ===============================
-DATA_MODE = "raw"  # switch to "processed" later
+STAGES = [
+    "correlation",
+    "timeline",
+    "cluster",
+    "significance",
+    "capacity",
+    "traffic",
+    "plots",
+    "export",
+]
 
+# Optional stages run only when requested
+DEFAULT_STAGES = [s for s in STAGES if s not in ("timeline", "significance")]
+
+# stage -> stages it cannot run without
+STAGE_DEPENDENCIES = {
+    "cluster": ["correlation"],
+    "significance": ["cluster"],
+    "capacity": ["cluster"],
+    "traffic": ["cluster"],
+    "plots": ["cluster"],
+    "export": ["cluster"],
+}
+
+
+def resolve_stages(requested):
+    """
+    Expands requested stages with their dependencies,
+    returned in pipeline order
+    """
+    unknown = [s for s in requested if s not in STAGES]
+    if unknown:
+        raise ValueError(
+            f"Unknown stage(s): {', '.join(unknown)} "
+            f"(choose from {', '.join(STAGES)})"
+        )
+
+    selected = set()
+    pending = list(requested)
+    while pending:
+        stage = pending.pop()
+        if stage in selected:
+            continue
+        selected.add(stage)
+        pending.extend(STAGE_DEPENDENCIES.get(stage, []))
+
+    return [s for s in STAGES if s in selected]
+
+
+def run_pipeline(dataset="raw", stages=None, threshold=CORRELATION_THRESHOLD,
+                 plots=True, output_dir=OUTPUT_DIR, engine="pairwise",
+                 workers=None, float32=False, resamples=200, resume=True):
+    stages = resolve_stages(stages or DEFAULT_STAGES)
+    if not plots:
+        stages = [s for s in stages if s != "plots"]
 
-def main():
     print("📡 Nokia Fronthaul Pattern Finder\n")
-    print("🔧 Mode:", DATA_MODE.upper())
-    print("🎚️ Correlation Threshold:", CORRELATION_THRESHOLD, "\n")
+    print("🔧 Mode:", dataset.upper())
+    print("🎚️ Correlation Threshold:", threshold)
+    print("🧩 Stages:", ", ".join(stages), "\n")
 
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
 
     # -------------------------------
     # Load dataset
     # -------------------------------
-    if DATA_MODE == "processed":
-        handler = CleanedCSVFolderHandler(PROCESSED_DATA_PATH)
-        dataset_label = "processed"
-    else:
-        handler = RawFileDataHandler(DATA_PATH)
-        dataset_label = "raw"
+    handler = load_handler(dataset)
 
     # -------------------------------
     # Discover cells
@@ -48,103 +96,368 @@ def main():
         print("⚠️ Not enough cells for topology inference")
         return
 
+    vectors = None
+    corr_df = None
+    link_map = None
+    confidences = {}
+    capacity_map = {}
+    traffic_map = {}
+    significance_map = {}
+
+    # -------------------------------
+    # Checkpoints: a stage is skipped when its fingerprint
+    # (inputs + parameters) matches the stored artifact
+    # -------------------------------
+    from artifact_store import ArtifactStore, fingerprint, source_fingerprint
+
+    store = ArtifactStore(os.path.join(output_dir, "artifacts"))
+    vectors_fp = fingerprint("vectors", dataset, source_fingerprint(handler))
+    corr_fp = fingerprint("correlation", vectors_fp, engine, float32)
+    cluster_fp = fingerprint("cluster", corr_fp, threshold, "single-linkage")
+
+    corr_manifest = None
+    if resume and "correlation" in stages:
+        corr_manifest = store.load("correlation", corr_fp)
+
+    preloaded = []
+
+    def read_captures():
+        # Decompress and parse capture files in parallel, once
+        if not preloaded and hasattr(handler, "preload"):
+            print("📦 Reading capture files...")
+            handler.preload()
+            preloaded.append(True)
+
+    needs_vectors = (
+        ("correlation" in stages and corr_manifest is None)
+        or "timeline" in stages
+        or "significance" in stages
+    )
+
     # -------------------------------
     # Build behavior fingerprints
     # -------------------------------
-    print("🧠 Building behavior fingerprints...")
-    vectors = LossVectorBuilder(handler).build()
-    np.save(os.path.join(OUTPUT_DIR, "loss_vectors.npy"), vectors)
+    if needs_vectors:
+        manifest = store.load("vectors", vectors_fp) if resume else None
+
+        if manifest:
+            print("♻️ Reusing behavior fingerprints (inputs unchanged)")
+            vectors = store.load_vectors(manifest)
+        else:
+            from loss_vector_builder import LossVectorBuilder
+
+            read_captures()
+
+            print("🧠 Building behavior fingerprints...")
+            vectors = LossVectorBuilder(handler).build()
+            store.save_vectors(vectors_fp, vectors, {"dataset": dataset})
 
     # -------------------------------
     # Correlation matrix
     # -------------------------------
-    print("📊 Computing correlation matrix...")
-    corr_engine = CorrelationEngine(CORRELATION_THRESHOLD)
-    corr_df = corr_engine.compute_matrix(vectors)
-    corr_df.to_csv(os.path.join(OUTPUT_DIR, "corr_matrix.csv"))
+    if corr_manifest:
+        print("♻️ Reusing correlation matrix")
+        corr_df = store.load_matrix(corr_manifest)
+    elif "correlation" in stages:
+        print("📊 Computing correlation matrix...")
+        if engine == "tiled":
+            import numpy as np
+            from tiled_correlation_engine import TiledCorrelationEngine
+
+            # Tiles are written straight into the checkpoint file,
+            # so the matrix is stored on disk once
+            store.begin("correlation")
+            corr_engine = TiledCorrelationEngine(
+                threshold,
+                workers=workers,
+                dtype=np.float32 if float32 else np.float64,
+                out_path=store.matrix_path()
+            )
+        else:
+            from correlation_engine import CorrelationEngine
+
+            corr_engine = CorrelationEngine(threshold)
+
+        corr_df = corr_engine.compute_matrix(vectors)
+        store.save_matrix(
+            corr_fp, corr_df, {"engine": engine, "float32": float32},
+            in_place=engine == "tiled"
+        )
+
+    # -------------------------------
+    # Time-varying topology
+    # -------------------------------
+    if "timeline" in stages:
+        from windowed_correlation import WindowedCorrelationEngine
+        from exporter import export_timeline
+
+        print("⏱️ Computing sliding-window topology timeline...")
+        windowed = WindowedCorrelationEngine(
+            threshold, ROLLING_WINDOW, ROLLING_STRIDE
+        )
+        timeline = export_timeline(
+            os.path.join(output_dir, "topology_timeline.json"),
+            windowed.timeline(vectors),
+            threshold,
+            ROLLING_WINDOW,
+            ROLLING_STRIDE
+        )
+        print(
+            f"   {timeline['window_count']} windows, "
+            f"{timeline['change_count']} with link changes"
+        )
 
     # -------------------------------
-    # Topology inference
+    # Topology inference + confidence
     # -------------------------------
-    print("🕸️ Inferring topology...")
-    cluster_engine = ClusteringEngine(CORRELATION_THRESHOLD)
-    link_map = cluster_engine.cluster(corr_df)
+    if "cluster" in stages:
+        manifest = store.load("cluster", cluster_fp) if resume else None
+
+        if manifest:
+            print("♻️ Reusing inferred topology")
+            link_map = manifest["data"]["link_map"]
+            confidences = manifest["data"]["confidences"]
+        else:
+            from clustering_engine import ClusteringEngine
+            from confidence import compute_confidence
+
+            print("🕸️ Inferring topology...")
+            cluster_engine = ClusteringEngine(threshold)
+            link_map = cluster_engine.cluster(corr_df)
+
+            print("📐 Computing confidence scores...")
+            confidences = compute_confidence(link_map, corr_df)
+
+            store.save(
+                "cluster", cluster_fp, {"threshold": threshold},
+                data={"link_map": link_map, "confidences": confidences}
+            )
 
     # -------------------------------
-    # Confidence scoring
+    # Link significance (optional)
     # -------------------------------
-    print("📐 Computing confidence scores...")
-    confidences = compute_confidence(link_map, corr_df)
+    if "significance" in stages:
+        from confidence import compute_significance
+
+        print(f"🎲 Testing link significance ({resamples} resamples)...")
+        significance_map = compute_significance(
+            link_map, vectors, n_resamples=resamples
+        )
 
     # -------------------------------
     # Capacity estimation
     # -------------------------------
-    print("📡 Estimating Ethernet link capacity (dual mode)...")
-    capacity_engine = LinkCapacityEstimator()
-    capacity_map = capacity_engine.estimate(link_map, handler)
+    if "capacity" in stages:
+        from capacity_estimator import LinkCapacityEstimator
+
+        capacity_engine = LinkCapacityEstimator()
+        # Keyed on the inputs and the link map itself, so a threshold
+        # change that leaves the links unchanged reuses it
+        capacity_fp = fingerprint(
+            "capacity", vectors_fp, link_map, capacity_engine.buffer_margin
+        )
+        manifest = store.load("capacity", capacity_fp) if resume else None
+
+        if manifest:
+            print("♻️ Reusing link capacity estimates")
+            capacity_map = manifest["data"]["capacity"]
+        else:
+            read_captures()
+            print("📡 Estimating Ethernet link capacity (dual mode)...")
+            capacity_map = capacity_engine.estimate(link_map, handler)
+            store.save(
+                "capacity", capacity_fp,
+                {"buffer_margin": capacity_engine.buffer_margin},
+                data={"capacity": capacity_map}
+            )
 
     # -------------------------------
     # Traffic time-series
     # -------------------------------
-    print("📈 Generating link traffic time-series...")
-    traffic_engine = LinkTrafficAnalyzer()
-    traffic_map = traffic_engine.build_timeseries(link_map, handler)
+    if "traffic" in stages:
+        from link_traffic_analyzer import LinkTrafficAnalyzer
+
+        traffic_engine = LinkTrafficAnalyzer()
+        traffic_fp = fingerprint(
+            "traffic", vectors_fp, link_map, traffic_engine.slot_duration_sec
+        )
+        manifest = store.load("traffic", traffic_fp) if resume else None
+
+        if manifest:
+            print("♻️ Reusing link traffic time-series")
+            traffic_map = store.load_traffic(manifest)
+        else:
+            read_captures()
+            print("📈 Generating link traffic time-series...")
+            traffic_map = traffic_engine.build_timeseries(link_map, handler)
+            store.save_traffic(
+                traffic_fp, traffic_map,
+                {"slot_duration_sec": traffic_engine.slot_duration_sec}
+            )
 
-    for link, series in traffic_map.items():
-        traffic_engine.plot(link, series, OUTPUT_DIR)
+        if "plots" in stages:
+            for link, series in traffic_map.items():
+                traffic_engine.plot(link, series, output_dir)
 
     # -------------------------------
     # Visualization
     # -------------------------------
-    viz = Visualizer()
+    if "plots" in stages:
+        from visualization import Visualizer
 
-    print("🎨 Generating heatmap...")
-    viz.save_heatmap(
-        corr_df,
-        os.path.join(OUTPUT_DIR, "heatmap.png")
-    )
+        viz = Visualizer()
 
-    print("🕸️ Generating topology graph...")
-    viz.save_topology_graph(
-        link_map,
-        confidences,
-        os.path.join(OUTPUT_DIR, "topology_graph.png")
-    )
+        print("🎨 Generating heatmap...")
+        viz.save_heatmap(
+            corr_df,
+            os.path.join(output_dir, "heatmap.png")
+        )
+
+        print("🕸️ Generating topology graph...")
+        viz.save_topology_graph(
+            link_map,
+            confidences,
+            os.path.join(output_dir, "topology_graph.png")
+        )
 
     # -------------------------------
     # Export for frontend / ML
     # -------------------------------
-    print("💾 Exporting topology JSON...")
-    export_topology(
-        os.path.join(OUTPUT_DIR, "topology.json"),
-        link_map,
-        confidences,
-        CORRELATION_THRESHOLD,
-        dataset_label,
-        len(cells),
-        capacity_map,
-        traffic_map
-    )
+    if "export" in stages:
+        from exporter import export_topology
+
+        print("💾 Exporting topology JSON...")
+        export_topology(
+            os.path.join(output_dir, "topology.json"),
+            link_map,
+            confidences,
+            threshold,
+            dataset,
+            len(cells),
+            capacity_map,
+            traffic_map,
+            significance_map
+        )
 
     # -------------------------------
     # Console summary
     # -------------------------------
-    print("\n🏁 DONE — Network Topology Discovered\n")
+    print("\n🏁 DONE\n")
 
-    for link, group in link_map.items():
+    for link, group in (link_map or {}).items():
         conf = confidences.get(link, 0.0)
         cap = capacity_map.get(link, {})
+        sig = significance_map.get(link, {})
+        p_value = f" (p={sig['p_value']})" if sig.get("p_value") is not None else ""
         print(
             f"{link}: {group} | "
-            f"confidence={conf:.2f} | "
+            f"confidence={conf:.2f}{p_value} | "
             f"peak={cap.get('peak_gbps', 0)} Gbps | "
             f"safe_capacity={cap.get('safe_gbps', 0)} Gbps"
         )
 
-    print(f"\n🧾 Frontend JSON saved to: {OUTPUT_DIR}/topology.json")
-    print(f"📊 Heatmap saved to: {OUTPUT_DIR}/heatmap.png")
-    print(f"🕸️ Topology graph saved to: {OUTPUT_DIR}/topology_graph.png")
-    print(f"📈 Traffic plots saved to: {OUTPUT_DIR}/traffic_Link_X.png")
+    if "export" in stages:
+        print(f"\n🧾 Frontend JSON saved to: {output_dir}/topology.json")
+    if "timeline" in stages:
+        print(f"⏱️ Topology timeline saved to: {output_dir}/topology_timeline.json")
+    if "plots" in stages:
+        print(f"📊 Heatmap saved to: {output_dir}/heatmap.png")
+        print(f"🕸️ Topology graph saved to: {output_dir}/topology_graph.png")
+        if "traffic" in stages:
+            print(f"📈 Traffic plots saved to: {output_dir}/traffic_Link_X.png")
+
+
+# ===============================
+# CLI
+# ===============================
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Nokia Fronthaul Pattern Finder"
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    run = sub.add_parser("run", help="Run the topology pipeline")
+    run.add_argument(
+        "--dataset", choices=["raw", "processed"], default="raw",
+        help="Input dataset (default: raw)"
+    )
+    run.add_argument(
+        "--stages", default=",".join(DEFAULT_STAGES),
+        help=f"Comma-separated stages to run: {','.join(STAGES)}"
+    )
+    run.add_argument(
+        "--threshold", type=float, default=CORRELATION_THRESHOLD,
+        help="Correlation threshold for linking cells"
+    )
+    run.add_argument(
+        "--no-plots", action="store_true",
+        help="Skip all PNG rendering"
+    )
+    run.add_argument(
+        "--resamples", type=int, default=200,
+        help="Resamples for the significance stage"
+    )
+    run.add_argument(
+        "--engine", choices=["pairwise", "tiled"], default="pairwise",
+        help="Correlation engine (tiled = parallel, memory-mapped)"
+    )
+    run.add_argument(
+        "--workers", type=int, default=None,
+        help="Processes for the tiled engine (default: all cores)"
+    )
+    run.add_argument(
+        "--float32", action="store_true",
+        help="Use float32 in the tiled engine to halve memory"
+    )
+    run.add_argument(
+        "--force", action="store_true",
+        help="Recompute every stage, ignoring saved artifacts"
+    )
+    run.add_argument(
+        "--output-dir", default=OUTPUT_DIR,
+        help="Directory for pipeline outputs"
+    )
+
+    serve = sub.add_parser("serve", help="Start the HTTP API")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+
+    return parser
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+
+    # No subcommand keeps the old behaviour: `main.py [flags]` == `main.py run [flags]`
+    if not argv or argv[0] not in ("run", "serve", "-h", "--help"):
+        argv = ["run"] + argv
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        import uvicorn
+        uvicorn.run("api:app", host=args.host, port=args.port)
+        return
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    try:
+        stages = resolve_stages(stages)
+    except ValueError as e:
+        parser.error(str(e))
+
+    run_pipeline(
+        dataset=args.dataset,
+        stages=stages,
+        threshold=args.threshold,
+        plots=not args.no_plots,
+        output_dir=args.output_dir,
+        engine=args.engine,
+        workers=args.workers,
+        float32=args.float32,
+        resamples=args.resamples,
+        resume=not args.force
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,201 @@
+# tiled_correlation_engine.py
+
+import os
+import weakref
+import tempfile
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+# Per-process views onto the shared inputs, set by _attach()
+_SHARED = {}
+
+# Thread-count variables read by the BLAS/OpenMP runtimes when numpy
+# is first imported
+_BLAS_THREAD_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def _attach(shm_name, shape, dtype, out_path):
+    shm = shared_memory.SharedMemory(name=shm_name)
+
+    _SHARED["shm"] = shm
+    _SHARED["z"] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _SHARED["out"] = np.lib.format.open_memmap(out_path, mode="r+")
+
+
+@contextmanager
+def _single_threaded_blas():
+    """
+    Limits BLAS to one thread in processes started inside the block,
+    so N workers use N cores rather than N x N threads. Only takes
+    effect in spawned workers, which import numpy afresh.
+    """
+    saved = {var: os.environ.get(var) for var in _BLAS_THREAD_VARS}
+    os.environ.update({var: "1" for var in _BLAS_THREAD_VARS})
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _detach():
+    _SHARED.pop("z", None)
+    _SHARED.pop("out", None)
+    shm = _SHARED.pop("shm", None)
+    if shm is not None:
+        shm.close()
+
+
+def _compute_tile(i0, i1, j0, j1):
+    z = _SHARED["z"]
+    out = _SHARED["out"]
+
+    block = z[i0:i1] @ z[j0:j1].T
+    out[i0:i1, j0:j1] = block
+    if i0 != j0:
+        out[j0:j1, i0:i1] = block.T
+
+
+class TiledCorrelationEngine:
+    """
+    Pearson correlation for large cell counts.
+
+    Loss vectors are standardized once into shared memory, the n x n
+    output is split into tiles, and upper-triangle tiles are computed
+    by a process pool that writes straight into a memory-mapped output
+    matrix (an .npy file). Neither the workers nor the parent hold a
+    private copy of the full inputs or output. Workers are spawned with
+    single-threaded BLAS, one tile product per core.
+    """
+
+    def __init__(self, threshold, tile_size=512, workers=None,
+                 dtype=np.float64, out_path=None):
+        """
+        tile_size: rows/cols per tile
+        workers: process count (defaults to all cores)
+        dtype: np.float32 halves memory for inputs and output
+        out_path: .npy file backing the output matrix (a temp file,
+                  deleted once the result is garbage collected, if None)
+        """
+        self.threshold = threshold
+        self.tile_size = tile_size
+        self.workers = workers or os.cpu_count() or 1
+        self.dtype = np.dtype(dtype)
+        self.out_path = out_path
+
+    def _standardize_into(self, vectors, cells, length, target):
+        """
+        Writes (x - mean) / (std * sqrt(T)) per cell, so that a row dot
+        product is the Pearson correlation. Constant or too-short
+        series get a zero row (correlation 0, like CorrelationEngine).
+        """
+        for i, cell in enumerate(cells):
+            x = np.asarray(vectors[cell][:length], dtype=np.float64)
+            std = x.std()
+
+            if length > 5 and std > 0:
+                target[i] = (x - x.mean()) / (std * np.sqrt(length))
+            else:
+                target[i] = 0
+
+    def _tiles(self, n):
+        step = self.tile_size
+        for i0 in range(0, n, step):
+            for j0 in range(i0, n, step):
+                yield i0, min(i0 + step, n), j0, min(j0 + step, n)
+
+    def compute_memmap(self, vectors):
+        """
+        Returns (cells, matrix) where matrix is an np.memmap of shape
+        (n, n) backed by the .npy file at out_path
+        """
+        cells = list(vectors.keys())
+        n = len(cells)
+        length = min(len(vectors[c]) for c in cells) if cells else 0
+
+        out_path = self.out_path
+        temporary = out_path is None
+        if temporary:
+            fd, out_path = tempfile.mkstemp(suffix=".npy")
+            os.close(fd)
+
+        out = np.lib.format.open_memmap(
+            out_path, mode="w+", dtype=self.dtype, shape=(n, n)
+        )
+        if temporary:
+            # Views (and DataFrames over them) keep the memmap alive;
+            # the temp file goes once the last of them is collected
+            weakref.finalize(out, _remove_quietly, out_path)
+        if n == 0:
+            return cells, out
+
+        shape = (n, max(length, 1))
+        shm = shared_memory.SharedMemory(
+            create=True, size=int(np.prod(shape)) * self.dtype.itemsize
+        )
+
+        try:
+            z = np.ndarray(shape, dtype=self.dtype, buffer=shm.buf)
+            self._standardize_into(vectors, cells, length, z)
+            del z
+
+            args = (shm.name, shape, self.dtype.str, out_path)
+            tiles = list(self._tiles(n))
+
+            if self.workers == 1 or len(tiles) == 1:
+                _attach(*args)
+                try:
+                    for tile in tiles:
+                        _compute_tile(*tile)
+                finally:
+                    _detach()
+            else:
+                with _single_threaded_blas(), ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_attach,
+                    initargs=args
+                ) as pool:
+                    # Consume results so worker errors are raised here
+                    for _ in pool.map(_compute_tile, *zip(*tiles)):
+                        pass
+        finally:
+            shm.close()
+            shm.unlink()
+
+        out.flush()
+        np.clip(out, -1.0, 1.0, out=out)
+        np.fill_diagonal(out, 1.0)
+        out.flush()
+
+        return cells, out
+
+    def compute_matrix(self, vectors):
+        """
+        Drop-in replacement for CorrelationEngine.compute_matrix.
+        Series are aligned to the shortest one.
+        """
+        cells, mat = self.compute_memmap(vectors)
+        return pd.DataFrame(mat, index=cells, columns=cells, copy=False)
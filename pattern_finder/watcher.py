@@ -0,0 +1,165 @@
+# watcher.py
+
+import os
+import time
+
+
+class FolderWatcher:
+    """
+    Detects changed capture files by polling os.stat (mtime + size).
+    Changes are debounced: files are reported only once the folder has
+    been quiet for `debounce_sec`, so a capture still being written is
+    picked up once rather than on every poll.
+    """
+
+    def __init__(self, folder, debounce_sec=2.0):
+        self.folder = folder
+        self.debounce_sec = debounce_sec
+        self._snapshot = self._scan()
+        self._pending = set()
+        self._last_change = None
+
+    def _scan(self):
+        snapshot = {}
+        try:
+            entries = os.scandir(self.folder)
+        except FileNotFoundError:
+            return snapshot
+
+        with entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+                snapshot[entry.name] = (st.st_mtime_ns, st.st_size)
+
+        return snapshot
+
+    def poll(self):
+        """
+        Returns the set of file names changed (added, modified or
+        removed) since the last report, or an empty set while
+        changes are still settling
+        """
+        current = self._scan()
+        names = set(current) | set(self._snapshot)
+        changed = {n for n in names if current.get(n) != self._snapshot.get(n)}
+        self._snapshot = current
+
+        now = time.monotonic()
+        if changed:
+            self._pending |= changed
+            self._last_change = now
+
+        if self._pending and now - self._last_change >= self.debounce_sec:
+            ready = self._pending
+            self._pending = set()
+            return ready
+
+        return set()
+
+
+def _match_links(old_links, new_links):
+    """
+    One-to-one matching of new links to old links, greedily by
+    Jaccard overlap of their cell sets (best pairs first).
+    Returns {new link id: old link id}; unmatched links are omitted.
+    """
+    candidates = []
+    for new in new_links:
+        new_cells = set(new["cells"])
+        for old in old_links:
+            shared = len(new_cells & set(old["cells"]))
+            if shared:
+                union = len(new_cells | set(old["cells"]))
+                candidates.append((shared / union, shared, new["id"], old["id"]))
+
+    candidates.sort(key=lambda c: (-c[0], -c[1]))
+
+    matched = {}
+    used_old = set()
+    for _, _, new_id, old_id in candidates:
+        if new_id in matched or old_id in used_old:
+            continue
+        matched[new_id] = old_id
+        used_old.add(old_id)
+
+    return matched
+
+
+def diff_topology(old, new):
+    """
+    Compares two exported topologies (see exporter.export_topology).
+    Link ids are reassigned on every run, so new links are first
+    matched to old ones by cell overlap; a cell has moved only when
+    the link it is in now is not the match of the link it was in.
+    Only unmatched links count as added or removed, and capacity and
+    confidence are compared between matched links.
+
+    Returns:
+    {
+      "cells_moved": [{"cell": "3", "from": "Link_1", "to": "Link_2"}],
+      "links_added": [{"id": ..., "cells": [...]}],
+      "links_removed": [{"id": ..., "cells": [...]}],
+      "capacity_changed": [{"id": ..., "cells": [...], "old": {}, "new": {}}],
+      "confidence_changed": [{"id": ..., "old": 0.4, "new": 0.5}]
+    }
+    """
+    old_links = (old or {}).get("links", [])
+    new_links = new.get("links", [])
+
+    old_by_id = {l["id"]: l for l in old_links}
+
+    old_owner = {c: l["id"] for l in old_links for c in l["cells"]}
+    new_owner = {c: l["id"] for l in new_links for c in l["cells"]}
+    matched = _match_links(old_links, new_links)
+    kept = set(matched.values())
+
+    diff = {
+        "cells_moved": [
+            {"cell": c, "from": old_owner.get(c), "to": new_owner[c]}
+            for c in new_owner
+            if old_owner.get(c) is None
+            or matched.get(new_owner[c]) != old_owner[c]
+        ] + [
+            {"cell": c, "from": old_owner[c], "to": None}
+            for c in old_owner if c not in new_owner
+        ],
+        "links_added": [
+            {"id": l["id"], "cells": l["cells"]}
+            for l in new_links if l["id"] not in matched
+        ],
+        "links_removed": [
+            {"id": l["id"], "cells": l["cells"]}
+            for l in old_links if l["id"] not in kept
+        ],
+        "capacity_changed": [],
+        "confidence_changed": []
+    }
+
+    # Matched links are the same link, even if some cells moved
+    for link in new_links:
+        if link["id"] not in matched:
+            continue
+        before = old_by_id[matched[link["id"]]]
+
+        if before.get("capacity") != link.get("capacity"):
+            diff["capacity_changed"].append({
+                "id": link["id"],
+                "cells": link["cells"],
+                "old": before.get("capacity"),
+                "new": link.get("capacity")
+            })
+
+        if before.get("confidence") != link.get("confidence"):
+            diff["confidence_changed"].append({
+                "id": link["id"],
+                "old": before.get("confidence"),
+                "new": link.get("confidence")
+            })
+
+    return diff
+
+
+def is_empty_diff(diff):
+    return not any(diff.values())
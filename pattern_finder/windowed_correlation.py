@@ -0,0 +1,139 @@
+# windowed_correlation.py
+
+import numpy as np
+import pandas as pd
+
+from clustering_engine import ClusteringEngine
+
+
+class WindowedCorrelationEngine:
+    """
+    Computes Pearson correlation between cell loss vectors over
+    sliding windows, to detect time-varying topology.
+
+    Per-window sums and cross-products are updated incrementally:
+    slots entering the window are added and slots leaving it are
+    subtracted, so a step only touches `stride` slots instead of the
+    whole window. Only the current window's matrix is held in memory.
+    """
+
+    def __init__(self, threshold, window, stride=None, resync_every=64):
+        """
+        window: window length in slots
+        stride: slots between consecutive windows (defaults to window)
+        resync_every: full recompute every N steps to bound float drift
+        """
+        if window < 2:
+            raise ValueError("window must be at least 2 slots")
+
+        self.threshold = threshold
+        self.window = int(window)
+        self.stride = int(stride or window)
+        self.resync_every = resync_every
+
+        if self.stride < 1:
+            raise ValueError("stride must be at least 1 slot")
+
+    def _stack(self, vectors):
+        cells = list(vectors.keys())
+        min_len = min(len(vectors[c]) for c in cells)
+
+        # float32 halves memory for long captures; sums are done in float64
+        stacked = np.empty((len(cells), min_len), dtype=np.float32)
+        for i, cell in enumerate(cells):
+            stacked[i] = vectors[cell][:min_len]
+
+        return cells, stacked
+
+    @staticmethod
+    def _sums(block):
+        block = block.astype(np.float64)
+        return block.sum(axis=1), block @ block.T
+
+    def _to_frame(self, cells, s, sxy):
+        w = self.window
+        mean = s / w
+        cov = sxy / w - np.outer(mean, mean)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+
+        denom = np.outer(std, std)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mat = np.where(denom > 0, cov / denom, 0.0)
+
+        mat = np.clip(mat, -1.0, 1.0)
+        np.fill_diagonal(mat, 1.0)
+
+        return pd.DataFrame(mat, index=cells, columns=cells)
+
+    def iter_matrices(self, vectors):
+        """
+        Yields (start_slot, end_slot, corr_df) for each window
+        """
+        cells, stacked = self._stack(vectors)
+        total = stacked.shape[1]
+        w = self.window
+
+        if len(cells) < 2 or total < w:
+            return
+
+        start = 0
+        steps = 0
+        s, sxy = self._sums(stacked[:, :w])
+
+        while True:
+            yield start, start + w, self._to_frame(cells, s, sxy)
+
+            nxt = start + self.stride
+            if nxt + w > total:
+                break
+
+            steps += 1
+            if self.stride >= w or steps % self.resync_every == 0:
+                s, sxy = self._sums(stacked[:, nxt:nxt + w])
+            else:
+                s_out, sxy_out = self._sums(stacked[:, start:nxt])
+                s_in, sxy_in = self._sums(stacked[:, start + w:nxt + w])
+                s += s_in - s_out
+                sxy += sxy_in - sxy_out
+
+            start = nxt
+
+    def timeline(self, vectors):
+        """
+        Returns one entry per window:
+        {
+          "window": 0,
+          "start_slot": 0,
+          "end_slot": 2000,
+          "links": {"Link_1": [...], ...},
+          "changed_cells": [...]   # cells whose link peers changed
+        }
+        """
+        cluster_engine = ClusteringEngine(self.threshold)
+        timeline = []
+        previous = None
+
+        for index, (start, end, corr_df) in enumerate(self.iter_matrices(vectors)):
+            link_map = cluster_engine.cluster(corr_df)
+
+            peers = {}
+            for group in link_map.values():
+                members = frozenset(group)
+                for cell in group:
+                    peers[cell] = members
+
+            if previous is None:
+                changed = []
+            else:
+                changed = [c for c in corr_df.index if peers.get(c) != previous.get(c)]
+
+            timeline.append({
+                "window": index,
+                "start_slot": start,
+                "end_slot": end,
+                "links": link_map,
+                "changed_cells": changed
+            })
+            previous = peers
+
+        return timeline